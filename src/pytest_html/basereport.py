@@ -3,9 +3,9 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 import datetime
 import json
-import math
 import os
 import re
+import shutil
 import time
 import warnings
 from collections import defaultdict
@@ -16,6 +16,18 @@ import pytest
 
 from pytest_html import __version__
 from pytest_html import extras
+from pytest_html.util import _dumps
+
+_ASSET_SANITIZE_RE = re.compile(r"[^\w.]")
+_COLUMN_NAME_RE = re.compile(r"col-(\w+)")
+_CELL_DATA_RE = re.compile(r"<td.*?>(.*?)</td>")
+_LINK_TYPES = frozenset({extras.FORMAT_JSON, extras.FORMAT_TEXT, extras.FORMAT_URL})
+_OUTCOME_LABELS = {
+    "passed": "Passed",
+    "failed": "Failed",
+    "skipped": "Skipped",
+    "rerun": "Rerun",
+}
 
 
 class BaseReport:
@@ -30,6 +42,12 @@ class BaseReport:
         self._max_asset_filename_length = int(
             config.getini("max_asset_filename_length")
         )
+        self._report_interval = float(config.getini("generate_report_on_test_interval"))
+        self._last_report_time = float("-inf")
+        self._redact_patterns = [
+            re.compile(pattern)
+            for pattern in config.getini("environment_table_redact_list")
+        ]
 
         self._reports = defaultdict(dict)
         self._report = report_data
@@ -43,7 +61,7 @@ class BaseReport:
 
     def _asset_filename(self, test_id, extra_index, test_index, file_extension):
         return "{}_{}_{}.{}".format(
-            re.sub(r"[^\w.]", "_", test_id),
+            _ASSET_SANITIZE_RE.sub("_", test_id),
             str(extra_index),
             str(test_index),
             file_extension,
@@ -52,8 +70,8 @@ class BaseReport:
     def _generate_report(self, self_contained=False):
         generated = datetime.datetime.now()
         test_data = self._report.data
-        test_data = json.dumps(test_data)
-        rendered_report = self._template.render(
+        test_data = _dumps(test_data)
+        report_stream = self._template.stream(
             title=self._report.title,
             date=generated.strftime("%d-%b-%Y"),
             time=generated.strftime("%H:%M:%S"),
@@ -68,7 +86,7 @@ class BaseReport:
             additional_summary=self._report.additional_summary,
         )
 
-        self._write_report(rendered_report)
+        self._write_report(report_stream)
 
     def _generate_environment(self):
         try:
@@ -92,12 +110,9 @@ class BaseReport:
         return metadata
 
     def _is_redactable_environment_variable(self, environment_variable):
-        redactable_regexes = self._config.getini("environment_table_redact_list")
-        for redactable_regex in redactable_regexes:
-            if re.match(redactable_regex, environment_variable):
-                return True
-
-        return False
+        return any(
+            pattern.match(environment_variable) for pattern in self._redact_patterns
+        )
 
     def _data_content(self, *args, **kwargs):
         pass
@@ -106,12 +121,17 @@ class BaseReport:
         pass
 
     def _process_extras(self, report, test_id):
-        test_index = hasattr(report, "rerun") and report.rerun + 1 or 0
+        test_index = getattr(report, "rerun", -1) + 1
         report_extras = getattr(report, "extras", [])
+        links = []
+        if not report_extras:
+            return report_extras, links
+
+        decoded_test_id = test_id.encode("utf-8").decode("unicode_escape")
         for extra_index, extra in enumerate(report_extras):
             content = extra["content"]
             asset_name = self._asset_filename(
-                test_id.encode("utf-8").decode("unicode_escape"),
+                decoded_test_id,
                 extra_index,
                 test_index,
                 extra["extension"],
@@ -134,11 +154,26 @@ class BaseReport:
                     content, asset_name=asset_name, mime_type=extra["mime_type"]
                 )
 
-        return report_extras
+            if extra["format_type"] in _LINK_TYPES:
+                links.append(extra)
+
+        return report_extras, links
 
-    def _write_report(self, rendered_report):
-        with self._report_path.open("w", encoding="utf-8") as f:
-            f.write(rendered_report)
+    def _write_report(self, report_stream):
+        # dump the template stream straight to the file instead of
+        # holding both the rendered str and its encoded bytes in memory,
+        # and only replace the previous report once rendering succeeded
+        report_path = Path(os.path.realpath(self._report_path))
+        tmp_path = report_path.with_name(f"{report_path.name}.tmp")
+        try:
+            with tmp_path.open("wb", buffering=1 << 20) as f:
+                report_stream.dump(f, encoding="utf-8")
+            if report_path.exists():
+                shutil.copymode(report_path, tmp_path)
+            os.replace(tmp_path, report_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
     def _run_count(self):
         relevant_outcomes = ["passed", "failed", "xpassed", "xfailed"]
@@ -148,19 +183,20 @@ class BaseReport:
                 counts += self._report.outcomes[outcome]["value"]
 
         plural = counts > 1
-        duration = _format_duration(self._report.total_duration)
 
         if self._report.running_state == "finished":
+            duration = _format_duration(self._report.total_duration)
             return f"{counts} {'tests' if plural else 'test'} took {duration}."
 
         return f"{counts}/{self._report.collected_items} {'tests' if plural else 'test'} done."
 
     def _hydrate_data(self, data, cells):
+        table_header = self._report.table_header
         for index, cell in enumerate(cells):
             # extract column name and data if column is sortable
-            if "sortable" in self._report.table_header[index]:
-                name_match = re.search(r"col-(\w+)", cell)
-                data_match = re.search(r"<td.*?>(.*?)</td>", cell)
+            if "sortable" in table_header[index]:
+                name_match = _COLUMN_NAME_RE.search(cell)
+                data_match = _CELL_DATA_RE.search(cell)
                 if name_match and data_match:
                     data[name_match.group(1)] = data_match.group(1)
 
@@ -177,6 +213,7 @@ class BaseReport:
         self._report.running_state = "started"
         if self._config.getini("generate_report_on_test"):
             self._generate_report()
+            self._last_report_time = time.monotonic()
 
     @pytest.hookimpl(trylast=True)
     def pytest_sessionfinish(self, session):
@@ -201,7 +238,7 @@ class BaseReport:
     @pytest.hookimpl(trylast=True)
     def pytest_collectreport(self, report):
         if report.failed:
-            self._process_report(report, 0, [])
+            self._process_report(report, 0, [], [])
 
     @pytest.hookimpl(trylast=True)
     def pytest_collection_finish(self, session):
@@ -242,24 +279,32 @@ class BaseReport:
                 test_duration += reports[0].duration
 
         processed_extras = []
+        links = []
         for key, reports in self._reports[report.nodeid].items():
             when, _ = key
             for each in reports:
                 test_id = report.nodeid
                 if when != "call":
                     test_id += f"::{when}"
-                processed_extras += self._process_extras(each, test_id)
+                report_extras, report_links = self._process_extras(each, test_id)
+                processed_extras += report_extras
+                links += report_links
 
         for key, reports in self._reports[report.nodeid].items():
             when, _ = key
             for each in reports:
                 dur = test_duration if when == "call" else each.duration
-                self._process_report(each, dur, processed_extras)
+                self._process_report(each, dur, processed_extras, links)
 
         if self._config.getini("generate_report_on_test"):
-            self._generate_report()
-
-    def _process_report(self, report, duration, processed_extras):
+            # regenerating serializes all collected results,
+            # so coalesce tests finishing in quick succession
+            now = time.monotonic()
+            if now - self._last_report_time >= self._report_interval:
+                self._generate_report()
+                self._last_report_time = now
+
+    def _process_report(self, report, duration, processed_extras, links):
         outcome = _process_outcome(report)
         try:
             # hook returns as list for some reason
@@ -277,11 +322,6 @@ class BaseReport:
             "extras": processed_extras,
         }
 
-        links = [
-            extra
-            for extra in data["extras"]
-            if extra["format_type"] in ["json", "text", "url"]
-        ]
         cells = [
             f'<td class="col-result">{outcome}</td>',
             f'<td class="col-testId">{test_id}</td>',
@@ -306,31 +346,28 @@ class BaseReport:
 
 def _format_duration(duration):
     if duration < 1:
-        return "{} ms".format(round(duration * 1000))
+        return f"{round(duration * 1000)} ms"
 
-    hours = math.floor(duration / 3600)
-    remaining_seconds = duration % 3600
-    minutes = math.floor(remaining_seconds / 60)
-    remaining_seconds = remaining_seconds % 60
-    seconds = round(remaining_seconds)
+    hours, remaining_seconds = divmod(round(duration), 3600)
+    minutes, seconds = divmod(remaining_seconds, 60)
 
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
 def _is_error(report):
     return (
-        report.when in ["setup", "teardown", "collect"] and report.outcome == "failed"
+        report.when in ("setup", "teardown", "collect") and report.outcome == "failed"
     )
 
 
 def _process_logs(report):
     log = []
     if report.longreprtext:
-        log.append(escape(report.longreprtext) + "\n")
+        log.append(escape(report.longreprtext, quote=False) + "\n")
     # Don't add captured output to reruns
     if report.outcome != "rerun":
         for section in report.sections:
-            header, content = map(escape, section)
+            header, content = (escape(part, quote=False) for part in section)
             log.append(f"{' ' + header + ' ':-^80}\n{content}")
 
             # weird formatting related to logs
@@ -347,20 +384,28 @@ def _process_outcome(report):
     if _is_error(report):
         return "Error"
     if hasattr(report, "wasxfail"):
-        if report.outcome in ["passed", "failed"]:
+        if report.outcome in ("passed", "failed"):
             return "XPassed"
         if report.outcome == "skipped":
             return "XFailed"
 
-    return report.outcome.capitalize()
+    return _OUTCOME_LABELS.get(report.outcome) or report.outcome.capitalize()
 
 
 def _process_links(links):
-    a_tag = '<a target="_blank" href="{content}" class="col-links__extra {format_type}">{name}</a>'
-    return "".join([a_tag.format_map(link) for link in links])
+    return "".join(
+        [
+            f'<a target="_blank" href="{link["content"]}" '
+            f'class="col-links__extra {link["format_type"]}">{link["name"]}</a>'
+            for link in links
+        ]
+    )
 
 
 def _fix_py(cells):
+    if all(type(html) is str for html in cells):
+        return cells
+
     # backwards-compat
     new_cells = []
     for html in cells:
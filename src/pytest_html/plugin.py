@@ -79,6 +79,13 @@ def pytest_addoption(parser):
         help="the HTML report will be generated after each test "
         "instead of at the end of the run.",
     )
+    parser.addini(
+        "generate_report_on_test_interval",
+        default=0,
+        help="minimum number of seconds between report generations "
+        "when 'generate_report_on_test' is enabled, 0 generates after "
+        "every test.",
+    )
 
 
 def pytest_configure(config):
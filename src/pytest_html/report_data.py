@@ -147,7 +147,7 @@ class ReportData:
             # Last index is "call"
             test = self._data["tests"][report.nodeid][-1]
             for section in report.sections:
-                header, content = map(escape, section)
+                header, content = (escape(part, quote=False) for part in section)
                 if "teardown" in header:
                     log.append(f"{' ' + header + ' ':-^80}\n{content}")
             test["log"] += _handle_ansi("\n".join(log))
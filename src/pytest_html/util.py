@@ -1,6 +1,7 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import json
 from functools import partial
 
 from jinja2 import Environment
@@ -19,6 +20,20 @@ except ImportError:
     _handle_ansi = _remove_ansi_escape_sequences
     _ansi_styles = []
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson is stricter than json, e.g. it rejects lone surrogates
+            # and integers outside the 64-bit range
+            return json.dumps(obj)
+
+except ImportError:
+    _dumps = json.dumps
+
 
 def _read_template(search_paths, template_name="index.jinja2"):
     env = Environment(
@@ -26,6 +41,9 @@ def _read_template(search_paths, template_name="index.jinja2"):
         autoescape=select_autoescape(
             enabled_extensions=("jinja2",),
         ),
+        # the resources don't change during a run, skip checking the
+        # included templates for changes on every render
+        auto_reload=False,
     )
     return env.get_template(template_name)
 
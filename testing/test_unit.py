@@ -1,4 +1,5 @@
 import importlib.resources
+import json
 import os
 import sys
 from pathlib import Path
@@ -7,6 +8,10 @@ import pkg_resources
 import pytest
 from assertpy import assert_that
 
+import pytest_html.util
+from pytest_html.basereport import _format_duration
+from pytest_html.util import _dumps
+
 pytest_plugins = ("pytester",)
 
 
@@ -154,3 +159,163 @@ def test_custom_css_selfcontained(pytester, css_file_path, expandvar):
     with open(pytester.path / "report.html") as f:
         html = f.read()
         assert_that(html).contains("* " + str(css_file_path)).contains("* two.css")
+
+
+def test_environment_table_redact_list(pytester):
+    pytester.makeini(
+        r"""
+        [pytest]
+        environment_table_redact_list = (?i).*token.*
+            (x)y
+            (a)\1
+    """
+    )
+    pytester.makeconftest(
+        """
+        from pytest_metadata.plugin import metadata_key
+
+        def pytest_configure(config):
+            config.stash[metadata_key]["Api_Token"] = "first secret"
+            config.stash[metadata_key]["aa"] = "second secret"
+            config.stash[metadata_key]["visible"] = "not redacted"
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    result = run(pytester)
+    result.assert_outcomes(passed=1)
+
+    with open(pytester.path / "report.html") as f:
+        html = f.read()
+        assert_that(html).does_not_contain("secret").contains("not redacted")
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [
+        (0.0004, "0 ms"),
+        (0.1234, "123 ms"),
+        (1, "00:00:01"),
+        (59.7, "00:01:00"),
+        (3599.6, "01:00:00"),
+        (3723.2, "01:02:03"),
+    ],
+)
+def test_format_duration(duration, expected):
+    assert_that(_format_duration(duration)).is_equal_to(expected)
+
+
+def test_report_data_not_serializable_by_orjson(pytester):
+    pytester.makeconftest(
+        """
+        from pytest_metadata.plugin import metadata_key
+
+        def pytest_configure(config):
+            config.stash[metadata_key]["Big"] = 2**70
+    """
+    )
+    pytester.makepyfile(
+        """
+        def test_surrogate():
+            raise ValueError("bad name \\udcff")
+    """
+    )
+    result = run(pytester)
+    result.assert_outcomes(failed=1)
+    assert_that(result.ret).is_equal_to(pytest.ExitCode.TESTS_FAILED)
+    assert_that(str(pytester.path / "report.html")).exists()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"tests": {"test_a": [{"result": "Passed"}]}},
+        {"environment": {"Big": 2**70}},
+        {"log": "bad name \udcff"},
+    ],
+)
+def test_dumps(data):
+    pytest.importorskip("orjson")
+    assert_that(json.loads(_dumps(data))).is_equal_to(json.loads(json.dumps(data)))
+
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    try:
+        importlib.reload(pytest_html.util)
+        assert_that(pytest_html.util._dumps).is_same_as(json.dumps)
+    finally:
+        monkeypatch.undo()
+        importlib.reload(pytest_html.util)
+
+
+@pytest.mark.parametrize(
+    "interval, expected", [(None, True), ("0", True), ("3600", False)]
+)
+def test_generate_report_on_test_interval(pytester, interval, expected):
+    ini = ["[pytest]", "generate_report_on_test = True"]
+    if interval is not None:
+        ini.append(f"generate_report_on_test_interval = {interval}")
+    pytester.makeini("\n".join(ini))
+    pytester.makepyfile(
+        f"""
+        from pathlib import Path
+
+        def test_first():
+            pass
+
+        def test_second():
+            html = Path("report.html").read_text(encoding="utf-8")
+            assert ("test_first" in html) is {expected}
+    """
+    )
+    result = run(pytester)
+    result.assert_outcomes(passed=2)
+
+    with open(pytester.path / "report.html") as f:
+        html = f.read()
+        assert_that(html).contains("test_first").contains("test_second")
+
+
+def test_failed_render_keeps_previous_report(pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        generate_report_on_test = True
+        generate_report_on_test_interval = 0
+    """
+    )
+    pytester.makeconftest(
+        """
+        class Unrenderable:
+            def __str__(self):
+                raise RuntimeError("cannot render")
+
+        def pytest_html_results_summary(prefix, summary, postfix):
+            prefix.append(Unrenderable())
+    """
+    )
+    pytester.makepyfile("def test_pass(): pass")
+    result = run(pytester)
+    assert_that(result.ret).is_equal_to(pytest.ExitCode.INTERNAL_ERROR)
+
+    with open(pytester.path / "report.html") as f:
+        html = f.read()
+        assert_that(html).contains("test_pass").contains("</html>")
+    assert_that(str(pytester.path / "report.html.tmp")).does_not_exist()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires POSIX symlinks")
+def test_report_path_symlink(pytester):
+    real_path = pytester.path / "real" / "report.html"
+    real_path.parent.mkdir()
+    real_path.write_text("old", encoding="utf-8")
+    real_path.chmod(0o640)
+    link_path = pytester.path / "link.html"
+    link_path.symlink_to(real_path)
+    pytester.makepyfile("def test_pass(): pass")
+    result = run(pytester, "link.html")
+    result.assert_outcomes(passed=1)
+
+    assert_that(link_path.is_symlink()).is_true()
+    assert_that(real_path.read_text(encoding="utf-8")).contains("test_pass")
+    assert_that(real_path.stat().st_mode & 0o777).is_equal_to(0o640)